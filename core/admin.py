@@ -1,8 +1,10 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib import messages
+from django.db.models.functions import Substr
 from django.utils.html import format_html
 from .models import User, Service, Action, Validation, Notification
+from .signals import broadcast_unread_counts, build_validation_notification, dispatch_notifications
 
 
 
@@ -11,6 +13,7 @@ def validate_users(modeladmin, request, queryset):
     Action admin pour valider les utilisateurs sélectionnés.
     """
     updated = queryset.update(is_validated=True)
+    User.invalidate_user_lists()
     messages.success(request, f'{updated} utilisateur(s) validé(s) avec succès.')
 
 validate_users.short_description = "✓ Valider les utilisateurs sélectionnés"
@@ -21,6 +24,7 @@ def assign_role_user(modeladmin, request, queryset):
     Attribuer le rôle 'Utilisateur' aux utilisateurs sélectionnés.
     """
     updated = queryset.update(role='user')
+    User.invalidate_user_lists()
     messages.success(request, f'{updated} utilisateur(s) ont reçu le rôle "Utilisateur".')
 
 assign_role_user.short_description = "👤 Attribuer le rôle: Utilisateur"
@@ -31,6 +35,7 @@ def assign_role_validator(modeladmin, request, queryset):
     Attribuer le rôle 'Validateur' aux utilisateurs sélectionnés.
     """
     updated = queryset.update(role='validator')
+    User.invalidate_user_lists()
     messages.success(request, f'{updated} utilisateur(s) ont reçu le rôle "Validateur".')
 
 assign_role_validator.short_description = "✓ Attribuer le rôle: Validateur"
@@ -41,6 +46,7 @@ def assign_role_admin(modeladmin, request, queryset):
     Attribuer le rôle 'Administrateur' aux utilisateurs sélectionnés.
     """
     updated = queryset.update(role='admin')
+    User.invalidate_user_lists()
     messages.success(request, f'{updated} utilisateur(s) ont reçu le rôle "Administrateur".')
 
 assign_role_admin.short_description = "⚙️ Attribuer le rôle: Administrateur"
@@ -85,7 +91,13 @@ class ServiceAdmin(admin.ModelAdmin):
     list_filter = ['statut', 'date_ouverture']
     search_fields = ['user__username', 'user__email']
     readonly_fields = ['date_ouverture']
-    date_hierarchy = 'date_ouverture'
+    
+    def get_queryset(self, request):
+        """
+        Fetch the user in the same query to avoid one query per row,
+        with the remaining time computed by the database.
+        """
+        return super().get_queryset(request).select_related('user').with_remaining_time()
     
     def get_remaining_display(self, obj):
         """
@@ -98,7 +110,7 @@ class ServiceAdmin(admin.ModelAdmin):
         """
         Make closed services read-only.
         """
-        if obj and obj.statut == 'fermé':
+        if obj and obj.statut == Service.Statut.FERME:
             return ['user', 'date_ouverture', 'date_fermeture', 'statut']
         return ['date_ouverture']
     
@@ -106,7 +118,7 @@ class ServiceAdmin(admin.ModelAdmin):
         """
         Prevent deletion of closed services.
         """
-        if obj and obj.statut == 'fermé':
+        if obj and obj.statut == Service.Statut.FERME:
             return False
         return super().has_delete_permission(request, obj)
 
@@ -118,6 +130,16 @@ class ValidationInline(admin.TabularInline):
     readonly_fields = ['validateur', 'statut', 'commentaire', 'date_validation']
     can_delete = False
     
+    def get_queryset(self, request):
+        """
+        Fetch the validator in the same query to avoid one query per inline row,
+        loading only the displayed columns.
+        """
+        return super().get_queryset(request).select_related('validateur').only(
+            'id', 'action', 'statut', 'commentaire', 'date_validation',
+            'validateur__username', 'validateur__role'
+        )
+    
     def has_add_permission(self, request, obj=None):
         return False
 
@@ -127,29 +149,35 @@ def validate_actions(modeladmin, request, queryset):
     """
     Valider les actions sélectionnées.
     """
-    from .models import Validation
-    
-    count = 0
+    validations = []
     warnings = []
     
+    # The changelist queryset already carries the author and the latest status
     for action in queryset:
         # Check if already validated
         if action.validation_status == 'validé':
             continue
         
         # Check for self-validation
-        if action.auteur == request.user:
+        if action.auteur_id == request.user.id:
             warnings.append(f"⚠️ Auto-validation détectée pour l'action #{action.id}")
         
-        # Create validation
-        Validation.objects.create(
+        validations.append(Validation(
             action=action,
             validateur=request.user,
             statut='validé'
-        )
-        count += 1
+        ))
+    
+    # Create all validations at once; bulk_create skips post_save,
+    # so the statistics and author notifications are handled explicitly
+    Validation.objects.bulk_create(validations, batch_size=500)
+    Action.invalidate_validation_stats(*{validation.action.auteur_id for validation in validations})
+    dispatch_notifications([
+        notification for notification in map(build_validation_notification, validations)
+        if notification is not None
+    ])
     
-    messages.success(request, f'{count} action(s) validée(s) avec succès.')
+    messages.success(request, f'{len(validations)} action(s) validée(s) avec succès.')
     if warnings:
         for warning in warnings:
             messages.warning(request, warning)
@@ -171,6 +199,22 @@ def reject_actions(modeladmin, request, queryset):
 reject_actions.short_description = "✗ Refuser les actions sélectionnées"
 
 
+# Validation badges, rendered once instead of for every changelist row
+VALIDATION_BADGE_HTML = (
+    '<span style="background-color: {}; color: white; padding: 3px 10px; '
+    'border-radius: 12px; font-size: 11px; font-weight: 500;">{}</span>'
+)
+VALIDATION_BADGE_COLORS = {
+    'en_attente': '#f59e0b',  # Orange
+    'validé': '#10b981',      # Green
+    'refusé': '#ef4444',      # Red
+}
+VALIDATION_BADGES = {
+    status: format_html(VALIDATION_BADGE_HTML, VALIDATION_BADGE_COLORS[status], label)
+    for status, label in Validation.STATUT_CHOICES
+}
+
+
 @admin.register(Action)
 class ActionAdmin(admin.ModelAdmin):
     """
@@ -196,13 +240,26 @@ class ActionAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """
+        Fetch author and service in the same query and annotate the latest
+        validation status to avoid one query per row for the badge.
+        The description is truncated by the database for the preview column.
+        """
+        return super().get_queryset(request).select_related(
+            'auteur', 'service'
+        ).with_validation_status().annotate(
+            _description_preview=Substr('description', 1, 51),
+        ).defer('description')
+    
     def get_description_preview(self, obj):
         """
         Show preview of description.
         """
-        if len(obj.description) > 50:
-            return obj.description[:50] + '...'
-        return obj.description
+        preview = obj._description_preview
+        if len(preview) > 50:
+            return preview[:50] + '...'
+        return preview
     get_description_preview.short_description = 'Description'
     
     def get_validation_badge(self, obj):
@@ -210,24 +267,10 @@ class ActionAdmin(admin.ModelAdmin):
         Display validation status as colored badge.
         """
         status = obj.validation_status
-        colors = {
-            'en_attente': '#f59e0b',  # Orange
-            'validé': '#10b981',      # Green
-            'refusé': '#ef4444',      # Red
-        }
-        labels = {
-            'en_attente': 'En attente',
-            'validé': 'Validé',
-            'refusé': 'Refusé',
-        }
-        color = colors.get(status, '#64748b')
-        label = labels.get(status, status)
-        
-        return format_html(
-            '<span style="background-color: {}; color: white; padding: 3px 10px; '
-            'border-radius: 12px; font-size: 11px; font-weight: 500;">{}</span>',
-            color, label
-        )
+        badge = VALIDATION_BADGES.get(status)
+        if badge is None:
+            badge = format_html(VALIDATION_BADGE_HTML, '#64748b', status)
+        return badge
     get_validation_badge.short_description = 'Validation'
     
     def get_readonly_fields(self, request, obj=None):
@@ -251,6 +294,14 @@ class ValidationAdmin(admin.ModelAdmin):
     search_fields = ['action__description', 'validateur__username', 'commentaire']
     readonly_fields = ['action', 'validateur', 'statut', 'commentaire', 'date_validation']
     
+    def get_queryset(self, request):
+        """
+        Fetch the action, its author and the validator in the same query.
+        """
+        return super().get_queryset(request).select_related(
+            'action', 'action__auteur', 'validateur'
+        )
+    
     def get_self_validation_badge(self, obj):
         """
         Display warning if self-validation.
@@ -287,7 +338,11 @@ def mark_as_read(modeladmin, request, queryset):
     """
     Marquer les notifications sélectionnées comme lues.
     """
+    # Only touch the rows that actually change
+    queryset = queryset.filter(lue=False)
+    user_ids = set(queryset.values_list('destinataire_id', flat=True))
     updated = queryset.update(lue=True)
+    broadcast_unread_counts(*user_ids)
     messages.success(request, f'{updated} notification(s) marquée(s) comme lue(s).')
 
 mark_as_read.short_description = "✓ Marquer comme lue(s)"
@@ -297,7 +352,11 @@ def mark_as_unread(modeladmin, request, queryset):
     """
     Marquer les notifications sélectionnées comme non lues.
     """
+    # Only touch the rows that actually change
+    queryset = queryset.filter(lue=True)
+    user_ids = set(queryset.values_list('destinataire_id', flat=True))
     updated = queryset.update(lue=False)
+    broadcast_unread_counts(*user_ids)
     messages.success(request, f'{updated} notification(s) marquée(s) comme non lue(s).')
 
 mark_as_unread.short_description = "● Marquer comme non lue(s)"
@@ -313,7 +372,17 @@ class NotificationAdmin(admin.ModelAdmin):
     search_fields = ['destinataire__username', 'message']
     readonly_fields = ['destinataire', 'type', 'message', 'date', 'action', 'validation']
     actions = [mark_as_read, mark_as_unread]
-    date_hierarchy = 'date'
+    
+    def get_queryset(self, request):
+        """
+        Fetch the recipient in the same query, loading only the displayed
+        columns (the related action/validation rows are not listed).
+        The message is truncated by the database for the preview column.
+        """
+        return super().get_queryset(request).select_related('destinataire').only(
+            'id', 'type', 'lue', 'date', 'action', 'validation',
+            'destinataire__username', 'destinataire__role'
+        ).annotate(_message_preview=Substr('message', 1, 81))
     
     def get_status_icon(self, obj):
         """
@@ -333,9 +402,10 @@ class NotificationAdmin(admin.ModelAdmin):
         """
         Show preview of message.
         """
-        if len(obj.message) > 80:
-            return obj.message[:80] + '...'
-        return obj.message
+        preview = obj._message_preview
+        if len(preview) > 80:
+            return preview[:80] + '...'
+        return preview
     get_message_preview.short_description = 'Message'
     
     def has_add_permission(self, request):
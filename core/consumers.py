@@ -2,9 +2,9 @@
 WebSocket consumers for real-time notifications.
 """
 
+import asyncio
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
 from .models import Notification
 
 
@@ -14,6 +14,11 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     Each user gets their own notification group.
     """
     
+    # Client message type -> handler method name
+    message_handlers = {
+        'get_unread_count': 'handle_get_unread_count',
+    }
+    
     async def connect(self):
         """
         Called when the websocket is handshaking as part of initial connection.
@@ -36,7 +41,14 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         
         await self.accept()
         
-        # Send initial unread count
+        # Send initial unread count without holding up the handshake
+        # (keep a reference so the task isn't garbage collected)
+        self.initial_count_task = asyncio.create_task(self.send_initial_count())
+    
+    async def send_initial_count(self):
+        """
+        Send the unread count right after the connection is accepted.
+        """
         unread_count = await self.get_unread_count()
         await self.send(text_data=json.dumps({
             'type': 'unread_count',
@@ -47,6 +59,9 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         """
         Called when the WebSocket closes for any reason.
         """
+        if hasattr(self, 'initial_count_task'):
+            self.initial_count_task.cancel()
+        
         if hasattr(self, 'group_name'):
             # Leave the notification group
             await self.channel_layer.group_discard(
@@ -60,36 +75,38 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         """
         try:
             data = json.loads(text_data)
-            message_type = data.get('type')
-            
-            if message_type == 'get_unread_count':
-                # Client is requesting the current unread count
-                unread_count = await self.get_unread_count()
-                await self.send(text_data=json.dumps({
-                    'type': 'unread_count',
-                    'count': unread_count
-                }))
         except json.JSONDecodeError:
-            pass
+            return
+        
+        # Ignore anything that isn't an object with a string type
+        message_type = data.get('type') if isinstance(data, dict) else None
+        if not isinstance(message_type, str):
+            return
+        
+        handler_name = self.message_handlers.get(message_type)
+        if handler_name:
+            await getattr(self, handler_name)(data)
+    
+    async def handle_get_unread_count(self, data):
+        """
+        Client is requesting the current unread count.
+        """
+        unread_count = await self.get_unread_count()
+        await self.send(text_data=json.dumps({
+            'type': 'unread_count',
+            'count': unread_count
+        }))
     
     async def notification_message(self, event):
         """
         Called when a notification is sent to the group.
         This is triggered by channel_layer.group_send()
         """
-        # Send the notification to the WebSocket
-        await self.send(text_data=json.dumps({
-            'type': 'new_notification',
-            'notification': event['notification'],
-            'count': event['count']
-        }))
+        # The payload is serialized once by the sender, forward it as is
+        await self.send(text_data=event['text'])
     
-    @database_sync_to_async
-    def get_unread_count(self):
+    async def get_unread_count(self):
         """
         Get the number of unread notifications for the current user.
         """
-        return Notification.objects.filter(
-            destinataire=self.user,
-            lue=False
-        ).count()
+        return await Notification.aget_unread_count(self.user.id)
@@ -0,0 +1,25 @@
+"""
+View decorators for role-based access.
+"""
+
+from functools import wraps
+
+from django.contrib import messages
+from django.shortcuts import redirect
+
+
+def require_admin(message):
+    """
+    Restrict a view to administrators.
+    Other users are redirected to the dashboard with the given error message.
+    To be placed under login_required.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.user.role != 'admin':
+                messages.error(request, message)
+                return redirect('dashboard')
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -12,28 +12,32 @@ class Command(BaseCommand):
         """
         # Find all open services that have expired
         expired_services = Service.objects.filter(
-            statut='ouvert',
+            statut=Service.Statut.OUVERT,
             date_fermeture__lt=timezone.now()
         )
-        
-        count = expired_services.count()
-        
+
+        # Report the services about to be closed, streaming only the
+        # reported columns instead of loading every row in memory
+        for username, date_ouverture in expired_services.values_list(
+            'user__username', 'date_ouverture'
+        ).iterator(chunk_size=500):
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Service fermé: {username} '
+                    f'(ouvert le {date_ouverture.strftime("%d/%m/%Y %H:%M")})'
+                )
+            )
+
+        # Close all expired services in a single UPDATE returning the row count
+        # (Service.close_service() only flips the status, no per-row logic)
+        count = expired_services.update(statut=Service.Statut.FERME)
+
         if count == 0:
             self.stdout.write(
                 self.style.SUCCESS('Aucun service expiré trouvé.')
             )
             return
-        
-        # Close all expired services
-        for service in expired_services:
-            service.close_service()
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'Service fermé: {service.user.username} '
-                    f'(ouvert le {service.date_ouverture.strftime("%d/%m/%Y %H:%M")})'
-                )
-            )
-        
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'\n✅ {count} service(s) expiré(s) fermé(s) avec succès.'
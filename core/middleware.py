@@ -1,34 +1,88 @@
+import re
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.shortcuts import redirect
 from django.urls import reverse
 
 
+@lru_cache(maxsize=None)
+def get_public_urls_pattern():
+    """
+    Expression régulière des préfixes d'URL publiques accessibles sans validation.
+    Les reverse() ne sont résolus qu'une seule fois par processus.
+    """
+    public_urls = {
+        reverse('login'),
+        reverse('register'),
+        reverse('logout'),
+        '/admin/',
+        '/static/',
+    }
+    return re.compile('|'.join(re.escape(url) for url in sorted(public_urls)))
+
+
 class ValidatedUserMiddleware:
     """
     Middleware pour bloquer l'accès aux pages protégées pour les utilisateurs non validés.
+    Compatible sync et async pour éviter un passage par un thread sous ASGI.
     """
     
+    sync_capable = True
+    async_capable = True
+    
+    # Fichiers servis sans aucune vérification de l'utilisateur
+    skipped_urls = ('/static/', '/media/', '/favicon.ico')
+    
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
         
         # URLs publiques accessibles sans validation
-        self.public_urls = [
-            reverse('login'),
-            reverse('register'),
-            reverse('logout'),
-            '/admin/',
-            '/static/',
-        ]
+        self.public_urls_pattern = get_public_urls_pattern()
     
     def __call__(self, request):
-        # Vérifier si l'utilisateur est authentifié
-        if request.user.is_authenticated:
-            # Vérifier si l'URL actuelle est publique
-            is_public = any(request.path.startswith(url) for url in self.public_urls)
-            
-            # Si l'utilisateur n'est pas validé et essaie d'accéder à une page protégée
-            if not request.user.is_validated and not is_public and not request.user.is_staff:
-                # Rediriger vers la page d'attente de validation
-                return redirect('login')
+        if self.async_mode:
+            return self.__acall__(request)
+        
+        # Ne pas charger la session ni l'utilisateur pour les fichiers statiques
+        if request.path.startswith(self.skipped_urls):
+            return self.get_response(request)
+        
+        if self.is_blocked(request, request.user):
+            # Rediriger vers la page d'attente de validation
+            return redirect('login')
         
         response = self.get_response(request)
         return response
+    
+    async def __acall__(self, request):
+        # Ne pas charger la session ni l'utilisateur pour les fichiers statiques
+        if request.path.startswith(self.skipped_urls):
+            return await self.get_response(request)
+        
+        # Réutiliser l'utilisateur chargé pour request.user, sans seconde requête
+        request.user = user = await request.auser()
+        
+        if self.is_blocked(request, user):
+            # Rediriger vers la page d'attente de validation
+            return redirect('login')
+        
+        response = await self.get_response(request)
+        return response
+    
+    def is_blocked(self, request, user):
+        """
+        Indique si l'utilisateur doit être redirigé hors de la page demandée.
+        """
+        # Vérifier si l'utilisateur est authentifié
+        if not user.is_authenticated:
+            return False
+        
+        # Vérifier si l'URL actuelle est publique
+        is_public = self.public_urls_pattern.match(request.path) is not None
+        
+        # Si l'utilisateur n'est pas validé et essaie d'accéder à une page protégée
+        return not user.is_validated and not is_public and not user.is_staff
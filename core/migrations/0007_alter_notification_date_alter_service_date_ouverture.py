@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-15 00:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_action_categorie_action_cause_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Date'),
+        ),
+        migrations.AlterField(
+            model_name='service',
+            name='date_ouverture',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Date d'ouverture"),
+        ),
+    ]
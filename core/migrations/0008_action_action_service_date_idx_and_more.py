@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-15 00:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_alter_notification_date_alter_service_date_ouverture'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='action',
+            index=models.Index(fields=['service', '-date_creation'], name='action_service_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='action',
+            index=models.Index(fields=['auteur', '-date_creation'], name='action_auteur_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['destinataire', 'lue'], name='notif_dest_lue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['destinataire', '-date'], name='notif_dest_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['user', 'statut'], name='service_user_statut_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='validation',
+            index=models.Index(fields=['action', '-date_validation'], name='validation_action_date_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.0.2 on 2026-10-15 00:50
+
+from django.db import migrations, models
+
+
+STATUTS = {
+    'ouvert': 1,
+    'fermé': 2,
+}
+
+
+def statut_to_int(apps, schema_editor):
+    Service = apps.get_model('core', 'Service')
+    for old, new in STATUTS.items():
+        Service.objects.filter(statut=old).update(statut_int=new)
+
+
+def statut_to_str(apps, schema_editor):
+    Service = apps.get_model('core', 'Service')
+    for old, new in STATUTS.items():
+        Service.objects.filter(statut_int=new).update(statut=old)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_action_action_service_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='service',
+            name='service_user_statut_idx',
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='statut_int',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Ouvert'), (2, 'Fermé')], default=1, verbose_name='Statut'),
+        ),
+        migrations.RunPython(statut_to_int, statut_to_str),
+        migrations.RemoveField(
+            model_name='service',
+            name='statut',
+        ),
+        migrations.RenameField(
+            model_name='service',
+            old_name='statut_int',
+            new_name='statut',
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['user', 'statut'], name='service_user_statut_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-15 00:53
+
+from django.db import migrations, models
+
+
+def close_duplicate_open_services(apps, schema_editor):
+    # Keep only the most recent open service of each user
+    Service = apps.get_model('core', 'Service')
+    latest_open = {}
+    for service_id, user_id in Service.objects.filter(statut=1).order_by('-date_ouverture').values_list('id', 'user_id'):
+        latest_open.setdefault(user_id, service_id)
+    Service.objects.filter(statut=1).exclude(id__in=latest_open.values()).update(statut=2)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_alter_service_statut'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_open_services, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='service',
+            constraint=models.UniqueConstraint(condition=models.Q(('statut', 1)), fields=('user',), name='service_one_open_per_user', violation_error_message="Cet utilisateur a déjà un service actif. Veuillez fermer le service actuel avant d'en ouvrir un nouveau."),
+        ),
+    ]
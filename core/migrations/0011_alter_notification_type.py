@@ -0,0 +1,56 @@
+# Generated by Django 6.0.2 on 2026-10-15 00:54
+
+from django.db import migrations, models
+
+
+TYPES = {
+    'validation': 1,
+    'refus': 2,
+    'commentaire': 3,
+    'nouvelle_action': 4,
+}
+
+
+def type_to_int(apps, schema_editor):
+    Notification = apps.get_model('core', 'Notification')
+    for old, new in TYPES.items():
+        Notification.objects.filter(type=old).update(type_int=new)
+
+
+def type_to_str(apps, schema_editor):
+    Notification = apps.get_model('core', 'Notification')
+    for old, new in TYPES.items():
+        Notification.objects.filter(type_int=new).update(type=old)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_service_one_open_per_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='type_int',
+            field=models.PositiveSmallIntegerField(choices=[(1, "Validation d'action"), (2, "Refus d'action"), (3, 'Nouveau commentaire'), (4, 'Nouvelle action')], default=1, verbose_name='Type'),
+            preserve_default=False,
+        ),
+        # Relax the legacy column so that the reverse path can re-add it
+        # empty before type_to_str fills it in
+        migrations.AlterField(
+            model_name='notification',
+            name='type',
+            field=models.CharField(choices=[('validation', "Validation d'action"), ('refus', "Refus d'action"), ('commentaire', 'Nouveau commentaire'), ('nouvelle_action', 'Nouvelle action')], max_length=20, null=True, verbose_name='Type'),
+        ),
+        migrations.RunPython(type_to_int, type_to_str),
+        migrations.RemoveField(
+            model_name='notification',
+            name='type',
+        ),
+        migrations.RenameField(
+            model_name='notification',
+            old_name='type_int',
+            new_name='type',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-15 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_alter_notification_type'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notif_dest_lue_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('lue', False)), fields=['destinataire'], name='notif_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-15 01:06
+
+from django.db import migrations, models
+
+
+def fill_missing_rejection_comments(apps, schema_editor):
+    # Give existing rejections without a comment a placeholder one
+    Validation = apps.get_model('core', 'Validation')
+    Validation.objects.filter(
+        models.Q(commentaire__isnull=True) | models.Q(commentaire=''),
+        statut='refusé'
+    ).update(commentaire='Aucun commentaire.')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_notification_notif_unread_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_missing_rejection_comments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='validation',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('statut', 'refusé'), _negated=True), models.Q(('commentaire__isnull', False), models.Q(('commentaire', ''), _negated=True)), _connector='OR'), name='validation_refus_requires_commentaire', violation_error_message='Un commentaire est obligatoire pour refuser une action.'),
+        ),
+    ]
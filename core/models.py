@@ -1,10 +1,22 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.cache import cache
+from django.db import connection, models
+from django.db.models.functions import Coalesce, Now
 from django.utils import timezone
 from datetime import timedelta
+from functools import cached_property
 from django.core.exceptions import ValidationError
 
 
+def _format_datetime(value):
+    """
+    Format a datetime as 'dd/mm/YYYY HH:MM' for the string representations,
+    without going through strftime and its locale handling.
+    """
+    return f"{value.day:02d}/{value.month:02d}/{value.year:04d} {value.hour:02d}:{value.minute:02d}"
+
+
 class User(AbstractUser):
     """
     Custom User model with role-based access and validation status.
@@ -30,8 +42,74 @@ class User(AbstractUser):
         verbose_name = 'Utilisateur'
         verbose_name_plural = 'Utilisateurs'
     
+    # Validated admin IDs and validated users (filter dropdowns) are cached
+    # until a user's username, role or validation changes
+    ADMIN_IDS_CACHE_KEY = 'users:admin_ids'
+    VALIDATED_USERS_CACHE_KEY = 'users:validated'
+    USER_LISTS_CACHE_TIMEOUT = 300
+    
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
+    
+    @classmethod
+    def get_admin_ids(cls):
+        """
+        Get the IDs of the validated administrators (cached).
+        """
+        return cache.get_or_set(
+            cls.ADMIN_IDS_CACHE_KEY,
+            lambda: list(cls.objects.filter(role='admin', is_validated=True).values_list('id', flat=True)),
+            cls.USER_LISTS_CACHE_TIMEOUT
+        )
+    
+    def get_active_service(self):
+        """
+        Get the open service of the user, if any.
+        The result is memoized on the instance: request.user being built
+        for each request, views and templates share a single query.
+        """
+        if not hasattr(self, '_active_service'):
+            self._active_service = Service.objects.with_remaining_time().filter(
+                user=self,
+                statut=Service.Statut.OUVERT
+            ).first()
+        return self._active_service
+    
+    @classmethod
+    def get_validated_users(cls):
+        """
+        Get the validated users ordered by username, as listed in the
+        filter dropdowns (cached).
+        """
+        return cache.get_or_set(
+            cls.VALIDATED_USERS_CACHE_KEY,
+            lambda: list(cls.objects.filter(is_validated=True).order_by('username').only('id', 'username', 'role')),
+            cls.USER_LISTS_CACHE_TIMEOUT
+        )
+    
+    @classmethod
+    def invalidate_user_lists(cls):
+        """
+        Drop the cached administrator IDs and validated users.
+        Must be called after writes that bypass signals (update).
+        """
+        cache.delete_many([cls.ADMIN_IDS_CACHE_KEY, cls.VALIDATED_USERS_CACHE_KEY])
+
+
+class ServiceQuerySet(models.QuerySet):
+    """
+    QuerySet for services with helpers for listing views.
+    """
+    
+    def with_remaining_time(self):
+        """
+        Annotate the time left before closure, computed by the database,
+        so that is_active() and get_remaining_time() don't compute it per row.
+        """
+        return self.annotate(_remaining_time=models.ExpressionWrapper(
+            models.F('date_fermeture') - Now(),
+            output_field=models.DurationField()
+        ))
 
 
 class Service(models.Model):
@@ -39,10 +117,12 @@ class Service(models.Model):
     Service model for 24-hour service periods.
     Each user can only have one active service at a time.
     """
-    STATUT_CHOICES = [
-        ('ouvert', 'Ouvert'),
-        ('fermé', 'Fermé'),
-    ]
+    class Statut(models.IntegerChoices):
+        OUVERT = 1, 'Ouvert'
+        FERME = 2, 'Fermé'
+    
+    # Service duration before automatic closure
+    DUREE = timedelta(hours=24)
     
     user = models.ForeignKey(
         User,
@@ -52,6 +132,7 @@ class Service(models.Model):
     )
     date_ouverture = models.DateTimeField(
         auto_now_add=True,
+        db_index=True,
         verbose_name='Date d\'ouverture'
     )
     date_fermeture = models.DateTimeField(
@@ -59,75 +140,107 @@ class Service(models.Model):
         blank=True,
         verbose_name='Date de fermeture'
     )
-    statut = models.CharField(
-        max_length=10,
-        choices=STATUT_CHOICES,
-        default='ouvert',
+    statut = models.PositiveSmallIntegerField(
+        choices=Statut.choices,
+        default=Statut.OUVERT,
         verbose_name='Statut'
     )
     
+    # The most recent services listed in the filter dropdowns are cached
+    # until a service is created or deleted
+    RECENT_CACHE_KEY = 'services:recent'
+    RECENT_CACHE_TIMEOUT = 300
+    RECENT_COUNT = 50
+    
+    objects = ServiceQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Service'
         verbose_name_plural = 'Services'
         ordering = ['-date_ouverture']
+        indexes = [
+            models.Index(fields=['user', 'statut'], name='service_user_statut_idx'),
+        ]
+        constraints = [
+            # Each user can only have one open service, enforced by the database
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(statut=1),  # Statut.OUVERT
+                name='service_one_open_per_user',
+                violation_error_message=(
+                    'Cet utilisateur a déjà un service actif. '
+                    'Veuillez fermer le service actuel avant d\'en ouvrir un nouveau.'
+                )
+            ),
+        ]
     
     def __str__(self):
-        return f"Service de {self.user.username} - {self.get_statut_display()} ({self.date_ouverture.strftime('%d/%m/%Y %H:%M')})"
+        return f"Service de {self.user.username} - {self.get_statut_display()} ({_format_datetime(self.date_ouverture)})"
     
     def save(self, *args, **kwargs):
         """
         Override save to automatically set date_fermeture to 24h after opening.
         """
-        if not self.pk:  # Only on creation
-            if not self.date_fermeture:
-                self.date_fermeture = timezone.now() + timedelta(hours=24)
+        # Only on creation, when no closing date was given
+        if self._state.adding and self.date_fermeture is None:
+            self.date_fermeture = timezone.now() + self.DUREE
         super().save(*args, **kwargs)
     
-    def clean(self):
+    @classmethod
+    def get_recent(cls):
         """
-        Validate that user doesn't have another active service.
-        """
-        if self.statut == 'ouvert':
-            # Check for other active services for this user
-            active_services = Service.objects.filter(
-                user=self.user,
-                statut='ouvert'
-            ).exclude(pk=self.pk)
-            
-            if active_services.exists():
-                raise ValidationError(
-                    'Cet utilisateur a déjà un service actif. '
-                    'Veuillez fermer le service actuel avant d\'en ouvrir un nouveau.'
-                )
+        Get the most recent services, as listed in the filter dropdowns (cached).
+        """
+        return cache.get_or_set(
+            cls.RECENT_CACHE_KEY,
+            lambda: list(cls.objects.order_by('-date_ouverture').only('id', 'date_ouverture')[:cls.RECENT_COUNT]),
+            cls.RECENT_CACHE_TIMEOUT
+        )
+    
+    @classmethod
+    def invalidate_recent(cls):
+        """
+        Drop the cached recent services.
+        """
+        cache.delete(cls.RECENT_CACHE_KEY)
+    
+    def _time_until_closure(self):
+        """
+        Time left until date_fermeture, negative once expired.
+        Uses the value annotated by with_remaining_time() when available.
+        """
+        if hasattr(self, '_remaining_time'):
+            return self._remaining_time
+        return self.date_fermeture - timezone.now()
     
     def is_active(self):
         """
         Check if the service is currently active (open and not expired).
         """
-        return self.statut == 'ouvert' and self.date_fermeture > timezone.now()
+        return self.statut == self.Statut.OUVERT and self._time_until_closure() > timedelta(0)
     
     def is_expired(self):
         """
         Check if the service has expired (past date_fermeture).
         """
-        return timezone.now() > self.date_fermeture
+        return self._time_until_closure() < timedelta(0)
     
     def close_service(self):
         """
         Close the service.
         """
-        self.statut = 'fermé'
-        self.save()
+        self.statut = self.Statut.FERME
+        self.save(update_fields=['statut'])
     
     def get_remaining_time(self):
         """
         Get the remaining time until service closure.
         Returns a timedelta object or None if service is closed.
         """
-        if self.statut == 'fermé':
+        if self.statut == self.Statut.FERME:
             return None
         
-        remaining = self.date_fermeture - timezone.now()
+        remaining = self._time_until_closure()
         return remaining if remaining.total_seconds() > 0 else timedelta(0)
     
     def get_remaining_time_display(self):
@@ -150,6 +263,37 @@ class Service(models.Model):
             return f"{minutes}min restantes"
 
 
+class ActionQuerySet(models.QuerySet):
+    """
+    QuerySet for actions with helpers for listing views.
+    """
+    
+    def with_validation_status(self):
+        """
+        Annotate the status of the latest validation of each action with a
+        correlated subquery, so that validation_status is read from the row.
+        """
+        latest_status = Validation.objects.filter(
+            action=models.OuterRef('pk')
+        ).order_by('-date_validation').values('statut')[:1]
+        return self.annotate(_validation_status=Coalesce(
+            models.Subquery(latest_status),
+            models.Value('en_attente')
+        ))
+    
+    def validation_stats(self):
+        """
+        Count the actions by latest validation status in a single query.
+        Returns a dictionary with total, validated, rejected and pending counts.
+        """
+        return self.with_validation_status().aggregate(
+            total=models.Count('id'),
+            validated=models.Count('id', filter=models.Q(_validation_status='validé')),
+            rejected=models.Count('id', filter=models.Q(_validation_status='refusé')),
+            pending=models.Count('id', filter=models.Q(_validation_status='en_attente')),
+        )
+
+
 class Action(models.Model):
     """
     Action model for PV entries.
@@ -219,37 +363,68 @@ class Action(models.Model):
         verbose_name='Date de modification'
     )
     
+    # Validation statistics of each author's actions, cached briefly and
+    # dropped when one of their actions is created, deleted or validated
+    STATS_CACHE_KEY = 'actions:stats:{}'
+    STATS_CACHE_TIMEOUT = 60
+    
+    objects = ActionQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Action'
         verbose_name_plural = 'Actions'
         ordering = ['-date_creation']
+        indexes = [
+            models.Index(fields=['service', '-date_creation'], name='action_service_date_idx'),
+            models.Index(fields=['auteur', '-date_creation'], name='action_auteur_date_idx'),
+        ]
     
     def __str__(self):
-        return f"Action de {self.auteur.username} - {self.date_creation.strftime('%d/%m/%Y %H:%M')}"
+        return f"Action de {self.auteur.username} - {_format_datetime(self.date_creation)}"
     
-    @property
+    @cached_property
     def validation_status(self):
         """
-        Get current validation status.
+        Get current validation status (computed once per instance).
         Returns: 'en_attente', 'validé', or 'refusé'
         """
-        latest = self.latest_validation
-        if latest:
-            return latest.statut
-        return 'en_attente'
+        if hasattr(self, '_validation_status'):
+            return self._validation_status
+        # Only the status column is needed, no Validation instance is built
+        return self.validations.order_by('-date_validation').values_list('statut', flat=True).first() or 'en_attente'
     
-    @property
+    @cached_property
     def latest_validation(self):
         """
-        Get the most recent validation for this action.
+        Get the most recent validation for this action (computed once per instance).
         """
         return self.validations.order_by('-date_validation').first()
     
+    @classmethod
+    def get_validation_stats(cls, user_id):
+        """
+        Get the validation statistics of a user's actions (cached).
+        """
+        return cache.get_or_set(
+            cls.STATS_CACHE_KEY.format(user_id),
+            lambda: cls.objects.filter(auteur_id=user_id).validation_stats(),
+            cls.STATS_CACHE_TIMEOUT
+        )
+    
+    @classmethod
+    def invalidate_validation_stats(cls, *user_ids):
+        """
+        Drop the cached validation statistics of the given users.
+        Must be called after writes that bypass signals (bulk_create).
+        """
+        cache.delete_many([cls.STATS_CACHE_KEY.format(user_id) for user_id in user_ids])
+    
     def get_validation_history(self):
         """
-        Get all validations for this action in chronological order.
+        Get all validations for this action in chronological order,
+        with their validator.
         """
-        return self.validations.order_by('date_validation')
+        return self.validations.select_related('validateur').order_by('date_validation')
     
     def can_be_edited(self):
         """
@@ -303,27 +478,36 @@ class Validation(models.Model):
         verbose_name = 'Validation'
         verbose_name_plural = 'Validations'
         ordering = ['-date_validation']
+        indexes = [
+            models.Index(fields=['action', '-date_validation'], name='validation_action_date_idx'),
+        ]
+        constraints = [
+            # A rejection always carries a comment, enforced by the database
+            models.CheckConstraint(
+                condition=~models.Q(statut='refusé') | (
+                    models.Q(commentaire__isnull=False) & ~models.Q(commentaire='')
+                ),
+                name='validation_refus_requires_commentaire',
+                violation_error_message='Un commentaire est obligatoire pour refuser une action.'
+            ),
+        ]
     
     def __str__(self):
-        return f"{self.get_statut_display()} par {self.validateur.username} - {self.date_validation.strftime('%d/%m/%Y %H:%M')}"
+        return f"{self.get_statut_display()} par {self.validateur.username} - {_format_datetime(self.date_validation)}"
     
     def is_self_validation(self):
         """
         Check if the validator is the same as the action author.
         Returns True if self-validation.
         """
-        return self.validateur == self.action.auteur
+        return self.validateur_id == self.action.auteur_id
     
     def clean(self):
         """
         Validate before saving.
+        The comment required on rejections is checked by the
+        validation_refus_requires_commentaire constraint.
         """
-        # Require comment for rejections
-        if self.statut == 'refusé' and not self.commentaire:
-            raise ValidationError(
-                'Un commentaire est obligatoire pour refuser une action.'
-            )
-        
         # Check if validator is admin
         if self.validateur.role != 'admin':
             raise ValidationError(
@@ -342,12 +526,19 @@ class Notification(models.Model):
     """
     Notification model to inform users of important events.
     """
-    TYPE_CHOICES = [
-        ('validation', 'Validation d\'action'),
-        ('refus', 'Refus d\'action'),
-        ('commentaire', 'Nouveau commentaire'),
-        ('nouvelle_action', 'Nouvelle action'),
-    ]
+    # Unread counts are cached until one of the user's notifications changes;
+    # the timeout only bounds staleness if an invalidation is ever missed.
+    UNREAD_COUNT_CACHE_KEY = 'notif:unread:{}'
+    UNREAD_COUNT_CACHE_TIMEOUT = 300
+    
+    class Type(models.IntegerChoices):
+        VALIDATION = 1, 'Validation d\'action'
+        REFUS = 2, 'Refus d\'action'
+        COMMENTAIRE = 3, 'Nouveau commentaire'
+        NOUVELLE_ACTION = 4, 'Nouvelle action'
+    
+    # Icons indexed by type value (index 0 is the fallback icon)
+    ICONS = ('📌', '✓', '✗', '💬', '📝')
     
     destinataire = models.ForeignKey(
         User,
@@ -355,9 +546,8 @@ class Notification(models.Model):
         related_name='notifications',
         verbose_name='Destinataire'
     )
-    type = models.CharField(
-        max_length=20,
-        choices=TYPE_CHOICES,
+    type = models.PositiveSmallIntegerField(
+        choices=Type.choices,
         verbose_name='Type'
     )
     message = models.TextField(
@@ -369,6 +559,7 @@ class Notification(models.Model):
     )
     date = models.DateTimeField(
         auto_now_add=True,
+        db_index=True,
         verbose_name='Date'
     )
     
@@ -394,22 +585,104 @@ class Notification(models.Model):
         ordering = ['-date']
         verbose_name = 'Notification'
         verbose_name_plural = 'Notifications'
+        indexes = [
+            # Unread notifications only: serves the unread counts and filters
+            models.Index(fields=['destinataire'], condition=models.Q(lue=False), name='notif_unread_idx'),
+            models.Index(fields=['destinataire', '-date'], name='notif_dest_date_idx'),
+        ]
     
     def __str__(self):
         status = "✓" if self.lue else "●"
-        return f"{status} {self.get_type_display()} pour {self.destinataire.username} - {self.date.strftime('%d/%m/%Y %H:%M')}"
+        return f"{status} {self.get_type_display()} pour {self.destinataire.username} - {_format_datetime(self.date)}"
     
     def get_icon(self):
         """
         Get the icon class for this notification type.
         """
-        icons = {
-            'validation': '✓',
-            'refus': '✗',
-            'commentaire': '💬',
-            'nouvelle_action': '📝',
-        }
-        return icons.get(self.type, '📌')
+        return self.ICONS[self.type]
+    
+    @classmethod
+    def get_unread_count(cls, user_id):
+        """
+        Get the number of unread notifications for a user (cached).
+        """
+        return cache.get_or_set(
+            cls.UNREAD_COUNT_CACHE_KEY.format(user_id),
+            lambda: cls.objects.filter(destinataire_id=user_id, lue=False).count(),
+            cls.UNREAD_COUNT_CACHE_TIMEOUT
+        )
+    
+    @classmethod
+    async def aget_unread_count(cls, user_id):
+        """
+        Asynchronous version of get_unread_count().
+        The whole lookup, cache read included, runs outside the single shared
+        sync thread so concurrent callers don't queue behind each other
+        (the cache backends' async methods run on that thread).
+        """
+        return await sync_to_async(cls._count_unread, thread_sensitive=False)(user_id)
+    
+    @classmethod
+    def _count_unread(cls, user_id):
+        """
+        Count (and cache) the unread notifications of a user, then release the
+        database connection held by the worker thread.
+        """
+        try:
+            return cls.get_unread_count(user_id)
+        finally:
+            connection.close()
+    
+    @classmethod
+    def get_unread_counts(cls, user_ids):
+        """
+        Get the number of unread notifications of several users (cached),
+        counting the missing ones in a single grouped query.
+        Returns a dictionary mapping user IDs to counts.
+        """
+        keys = {cls.UNREAD_COUNT_CACHE_KEY.format(user_id): user_id for user_id in user_ids}
+        counts = {keys[key]: count for key, count in cache.get_many(keys).items()}
+        
+        missing = [user_id for user_id in keys.values() if user_id not in counts]
+        if missing:
+            fetched = dict.fromkeys(missing, 0)
+            fetched.update(
+                cls.objects.filter(destinataire_id__in=missing, lue=False)
+                .order_by()
+                .values_list('destinataire_id')
+                .annotate(count=models.Count('id'))
+            )
+            cache.set_many(
+                {cls.UNREAD_COUNT_CACHE_KEY.format(user_id): count for user_id, count in fetched.items()},
+                cls.UNREAD_COUNT_CACHE_TIMEOUT
+            )
+            counts.update(fetched)
+        
+        return counts
+    
+    @classmethod
+    def increment_unread_counts(cls, increments):
+        """
+        Add newly created unread notifications to the cached counts.
+        Users without a cached count are counted again on the next read.
+        
+        Args:
+            increments: Dictionary mapping user IDs to the number of new
+                unread notifications
+        """
+        for user_id, increment in increments.items():
+            try:
+                cache.incr(cls.UNREAD_COUNT_CACHE_KEY.format(user_id), increment)
+            except ValueError:
+                pass
+    
+    @classmethod
+    def invalidate_unread_count(cls, *user_ids):
+        """
+        Drop the cached unread counts of the given users.
+        Must be called after writes that bypass signals (update, bulk_create).
+        """
+        cache.delete_many([cls.UNREAD_COUNT_CACHE_KEY.format(user_id) for user_id in user_ids])
     
     def get_url(self):
         """
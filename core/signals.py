@@ -1,32 +1,169 @@
-from django.db.models.signals import post_save
+import asyncio
+import json
+from collections import Counter
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import Validation, Action, Notification, User
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from .models import Validation, Action, Notification, Service, User
+
 
+# Notification messages, formatted with str.format_map
+NOTIFICATION_DATE_FORMAT = '%d/%m/%Y à %H:%M'
+VALIDATION_MESSAGES = {
+    'validé': (Notification.Type.VALIDATION, "Votre action du {date} a été validée par {validateur}."),
+    'refusé': (Notification.Type.REFUS, "Votre action du {date} a été refusée par {validateur}."),
+}
+COMMENT_MESSAGE = (Notification.Type.COMMENTAIRE, "{validateur} a commenté votre action du {date}.")
+NEW_ACTION_MESSAGE = "Nouvelle action créée par {auteur} le {date}.\nDescription : {description}"
 
-def send_websocket_notification(user, notification_data, unread_count):
+
+def send_websocket_notifications(messages):
     """
-    Send a notification to a user via WebSocket.
+    Send notifications to users via WebSocket.
+    All the group sends run concurrently in a single event loop.
     
     Args:
-        user: User to notify
-        notification_data: Dictionary containing notification details
-        unread_count: Current unread notification count
+        messages: List of (user_id, text) tuples, text being the JSON
+            payload forwarded as is to the WebSocket
     """
+    # Imported here so that batch commands loading the signals don't pay
+    # for the channel layer machinery unless a notification is sent
+    from channels.layers import get_channel_layer
+    from asgiref.sync import async_to_sync
+    
     channel_layer = get_channel_layer()
-    group_name = f'notifications_{user.id}'
     
-    async_to_sync(channel_layer.group_send)(
-        group_name,
-        {
-            'type': 'notification_message',
-            'notification': notification_data,
-            'count': unread_count
-        }
+    async def send_all():
+        await asyncio.gather(*(
+            channel_layer.group_send(
+                f'notifications_{user_id}',
+                {
+                    'type': 'notification_message',
+                    'text': text
+                }
+            )
+            for user_id, text in messages
+        ))
+    
+    async_to_sync(send_all)()
+
+
+def send_unread_counts(user_ids):
+    """
+    Send the current unread count of the given users via WebSocket, so
+    that their open pages update the badge without polling.
+    """
+    unread_counts = Notification.get_unread_counts(user_ids)
+    send_websocket_notifications([
+        (user_id, json.dumps({'type': 'unread_count', 'count': unread_count}))
+        for user_id, unread_count in unread_counts.items()
+    ])
+
+
+def broadcast_unread_counts(*user_ids):
+    """
+    Drop the cached unread counts of the given users and send the new ones
+    via WebSocket once the transaction is committed.
+    Must be called after writes that bypass signals (update).
+    """
+    if not user_ids:
+        return
+    
+    Notification.invalidate_unread_count(*user_ids)
+    transaction.on_commit(partial(send_unread_counts, user_ids))
+
+
+def build_validation_notification(validation):
+    """
+    Build the (unsaved) notification informing the action author about a
+    validation, rejection, or comment.
+    Returns None for self-validations.
+    """
+    action = validation.action
+    author = action.auteur
+    
+    # Don't notify if the validator is the author (self-validation)
+    if validation.validateur_id == author.id:
+        return None
+    
+    # Determine notification type and message
+    notif_type, template = VALIDATION_MESSAGES.get(validation.statut, COMMENT_MESSAGE)
+    message = template.format_map({
+        'date': action.date_creation.strftime(NOTIFICATION_DATE_FORMAT),
+        'validateur': validation.validateur.username,
+    })
+    # Rejections and comments carry the validator's comment
+    if notif_type != Notification.Type.VALIDATION and validation.commentaire:
+        message += f"\n\nCommentaire : {validation.commentaire}"
+    
+    return Notification(
+        destinataire=author,
+        type=notif_type,
+        message=message,
+        action=action,
+        validation=validation
     )
 
 
+def send_new_notifications(notifications):
+    """
+    Add saved notifications to the cached unread counts of their recipients
+    and send them via WebSocket.
+    Runs once the transaction is committed, so a rollback leaves the cached
+    counts untouched.
+    
+    Args:
+        notifications: List of saved Notification instances
+    """
+    # bulk_create does not send post_save: bump the cached unread counts
+    # instead of counting again, then read them for all recipients at once
+    new_unread = Counter(notification.destinataire_id for notification in notifications)
+    Notification.increment_unread_counts(new_unread)
+    unread_counts = Notification.get_unread_counts(new_unread)
+    
+    # Serialize each payload once here, the consumers of every open
+    # connection of the recipient forward the text without re-encoding it
+    send_websocket_notifications([
+        (
+            notification.destinataire_id,
+            json.dumps({
+                'type': 'new_notification',
+                'notification': {
+                    'id': notification.id,
+                    'type': notification.type,
+                    'message': notification.message,
+                    'date': notification.date.isoformat(),
+                    'icon': notification.get_icon(),
+                },
+                'count': unread_counts[notification.destinataire_id]
+            })
+        )
+        for notification in notifications
+    ])
+
+
+def dispatch_notifications(notifications):
+    """
+    Save notifications in a single query and send them via WebSocket.
+    
+    Args:
+        notifications: List of unsaved Notification instances
+    """
+    if not notifications:
+        return
+    
+    # The IDs sent over the WebSocket come back from the INSERT itself
+    # (RETURNING on PostgreSQL and SQLite), no SELECT is needed to recover them.
+    # ignore_conflicts is not used: it prevents the IDs from being returned.
+    notifications = Notification.objects.bulk_create(notifications, batch_size=500)
+    
+    # Update the cached counts and send once the data is committed,
+    # outside of the originating transaction
+    transaction.on_commit(partial(send_new_notifications, notifications))
+
+
 @receiver(post_save, sender=Validation)
 def create_validation_notification(sender, instance, created, **kwargs):
     """
@@ -34,50 +171,91 @@ def create_validation_notification(sender, instance, created, **kwargs):
     Notifies the action author about validation, rejection, or comment.
     """
     if created:
-        action = instance.action
-        author = action.auteur
-        
-        # Don't notify if the validator is the author (self-validation)
-        if instance.validateur == author:
-            return
-        
-        # Determine notification type and message
-        if instance.statut == 'validé':
-            notif_type = 'validation'
-            message = f"Votre action du {action.date_creation.strftime('%d/%m/%Y à %H:%M')} a été validée par {instance.validateur.username}."
-        elif instance.statut == 'refusé':
-            notif_type = 'refus'
-            message = f"Votre action du {action.date_creation.strftime('%d/%m/%Y à %H:%M')} a été refusée par {instance.validateur.username}."
-            if instance.commentaire:
-                message += f"\n\nCommentaire : {instance.commentaire}"
-        else:  # en_attente with comment
-            notif_type = 'commentaire'
-            message = f"{instance.validateur.username} a commenté votre action du {action.date_creation.strftime('%d/%m/%Y à %H:%M')}."
-            if instance.commentaire:
-                message += f"\n\nCommentaire : {instance.commentaire}"
-        
-        # Create notification in database
-        notification = Notification.objects.create(
-            destinataire=author,
-            type=notif_type,
-            message=message,
-            action=action,
-            validation=instance
-        )
+        # Load the action, its author and the validator in a single query,
+        # unless the caller already provided them
+        if not (
+            Validation.action.is_cached(instance)
+            and Validation.validateur.is_cached(instance)
+            and Action.auteur.is_cached(instance.action)
+        ):
+            instance = Validation.objects.select_related(
+                'action__auteur', 'validateur'
+            ).get(pk=instance.pk)
         
-        # Send via WebSocket
-        unread_count = Notification.objects.filter(destinataire=author, lue=False).count()
-        send_websocket_notification(
-            author,
-            {
-                'id': notification.id,
-                'type': notif_type,
-                'message': message,
-                'date': notification.date.isoformat(),
-                'icon': notification.get_icon(),
-            },
-            unread_count
-        )
+        notification = build_validation_notification(instance)
+        if notification is not None:
+            dispatch_notifications([notification])
+
+
+@receiver(post_save, sender=Validation)
+def invalidate_validation_stats(sender, instance, **kwargs):
+    """
+    Drop the cached validation statistics of the action author when a
+    validation is saved.
+    """
+    Action.invalidate_validation_stats(instance.action.auteur_id)
+
+
+@receiver(post_delete, sender=Validation)
+def invalidate_deleted_validation_stats(sender, instance, origin=None, **kwargs):
+    """
+    Drop the cached validation statistics of the action author when a
+    validation is deleted.
+    Cascades from an action, service or user delete are skipped: the
+    action's own post_delete already drops the stats, and looking the
+    action up here would cost one query per validation.
+    """
+    if isinstance(origin, Validation) or getattr(origin, 'model', None) is Validation:
+        Action.invalidate_validation_stats(instance.action.auteur_id)
+
+
+@receiver(post_save, sender=Action)
+def invalidate_created_action_stats(sender, instance, created, **kwargs):
+    """
+    Drop the cached validation statistics of the author when an action
+    is created (edits don't change the counts).
+    """
+    if created:
+        Action.invalidate_validation_stats(instance.auteur_id)
+
+
+@receiver(post_delete, sender=Action)
+def invalidate_deleted_action_stats(sender, instance, **kwargs):
+    """
+    Drop the cached validation statistics of the author when an action
+    is deleted.
+    """
+    Action.invalidate_validation_stats(instance.auteur_id)
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_unread_count(sender, instance, **kwargs):
+    """
+    Refresh the unread count of the recipient when a notification changes.
+    """
+    broadcast_unread_counts(instance.destinataire_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_lists(sender, instance, update_fields=None, **kwargs):
+    """
+    Drop the cached user lists when a user may have changed username, role
+    or validation status (saves limited to other fields, like last_login, are ignored).
+    """
+    if update_fields and not {'username', 'role', 'is_validated'} & set(update_fields):
+        return
+    User.invalidate_user_lists()
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_recent_services(sender, instance, **kwargs):
+    """
+    Drop the cached recent services when a service changes.
+    """
+    Service.invalidate_recent()
 
 
 @receiver(post_save, sender=Action)
@@ -86,41 +264,26 @@ def create_new_action_notification(sender, instance, created, **kwargs):
     Create notification for admins when a new action is created.
     """
     if created:
-        # Get all admin users
-        admins = User.objects.filter(role='admin', is_validated=True)
+        # Get all admin users, except the author
+        admin_ids = [admin_id for admin_id in User.get_admin_ids() if admin_id != instance.auteur_id]
         
-        # Don't notify the author
-        admins = admins.exclude(id=instance.auteur.id)
+        # The message is the same for every admin
+        description = instance.description
+        message = NEW_ACTION_MESSAGE.format_map({
+            'auteur': instance.auteur.username,
+            'date': instance.date_creation.strftime(NOTIFICATION_DATE_FORMAT),
+            'description': f"{description[:100]}..." if len(description) > 100 else description,
+        })
         
-        # Create notification for each admin
-        for admin in admins:
-            message = f"Nouvelle action créée par {instance.auteur.username} le {instance.date_creation.strftime('%d/%m/%Y à %H:%M')}."
-            if len(instance.description) > 100:
-                message += f"\nDescription : {instance.description[:100]}..."
-            else:
-                message += f"\nDescription : {instance.description}"
-            
-            # Create notification in database
-            notification = Notification.objects.create(
-                destinataire=admin,
-                type='nouvelle_action',
+        dispatch_notifications([
+            Notification(
+                destinataire_id=admin_id,
+                type=Notification.Type.NOUVELLE_ACTION,
                 message=message,
                 action=instance
             )
-            
-            # Send via WebSocket
-            unread_count = Notification.objects.filter(destinataire=admin, lue=False).count()
-            send_websocket_notification(
-                admin,
-                {
-                    'id': notification.id,
-                    'type': 'nouvelle_action',
-                    'message': message,
-                    'date': notification.date.isoformat(),
-                    'icon': notification.get_icon(),
-                },
-                unread_count
-            )
+            for admin_id in admin_ids
+        ])
 
 
 def notify_user(user, notif_type, message, action=None, validation=None):
@@ -129,29 +292,17 @@ def notify_user(user, notif_type, message, action=None, validation=None):
     
     Args:
         user: User to notify
-        notif_type: Type of notification ('validation', 'refus', 'commentaire', 'nouvelle_action')
+        notif_type: Type of notification (Notification.Type value)
         message: Notification message
         action: Related action (optional)
         validation: Related validation (optional)
     """
-    notification = Notification.objects.create(
-        destinataire=user,
-        type=notif_type,
-        message=message,
-        action=action,
-        validation=validation
-    )
-    
-    # Send via WebSocket
-    unread_count = Notification.objects.filter(destinataire=user, lue=False).count()
-    send_websocket_notification(
-        user,
-        {
-            'id': notification.id,
-            'type': notif_type,
-            'message': message,
-            'date': notification.date.isoformat(),
-            'icon': notification.get_icon(),
-        },
-        unread_count
-    )
+    dispatch_notifications([
+        Notification(
+            destinataire=user,
+            type=notif_type,
+            message=message,
+            action=action,
+            validation=validation
+        )
+    ])
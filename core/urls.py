@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import include, path
 from . import views
 
 urlpatterns = [
@@ -12,10 +12,15 @@ urlpatterns = [
     
     # Validation URLs
     path('validations/pending/', views.pending_validations, name='pending_validations'),
-    path('action/<int:action_id>/validate/', views.validate_action, name='validate_action'),
-    path('action/<int:action_id>/reject/', views.reject_action, name='reject_action'),
-    path('action/<int:action_id>/comment/', views.comment_action, name='comment_action'),
-    path('action/<int:action_id>/history/', views.validation_history, name='validation_history'),
+    
+    # Per-action URLs, grouped behind a single prefix
+    path('action/<int:action_id>/', include([
+        path('validate/', views.validate_action, name='validate_action'),
+        path('reject/', views.reject_action, name='reject_action'),
+        path('comment/', views.comment_action, name='comment_action'),
+        path('history/', views.validation_history, name='validation_history'),
+        path('edit/', views.action_edit, name='action_edit'),
+    ])),
     
     # Consultation URLs
     path('consultation/actions/', views.global_actions_view, name='global_actions'),
@@ -29,7 +34,6 @@ urlpatterns = [
     # Action Management URLs
     path('actions/', views.action_list, name='action_list'),
     path('action/create/', views.action_create, name='action_create'),
-    path('action/<int:action_id>/edit/', views.action_edit, name='action_edit'),
     
     # Notification URLs
     path('notifications/', views.notifications_list, name='notifications_list'),
@@ -1,12 +1,34 @@
-from django.shortcuts import render, redirect
+import hashlib
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.exceptions import ValidationError
-from django.http import JsonResponse
-from .forms import UserRegistrationForm
-from .models import Service, User
-
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, DurationField, F, Q, Sum
+from django.http import Http404, JsonResponse
+from django.utils import timezone
+from .decorators import require_admin
+from .forms import ActionForm, UserRegistrationForm
+from .models import Action, Notification, Service, User, Validation
+from .signals import broadcast_unread_counts
+
+
+# Status filter values used in the consultation URLs
+SERVICE_STATUS_FILTERS = {
+    'ouvert': Service.Statut.OUVERT,
+    'fermé': Service.Statut.FERME,
+}
+NOTIFICATION_TYPE_FILTERS = {
+    'validation': Notification.Type.VALIDATION,
+    'refus': Notification.Type.REFUS,
+    'commentaire': Notification.Type.COMMENTAIRE,
+    'nouvelle_action': Notification.Type.NOUVELLE_ACTION,
+}
 
 
 def register(request):
@@ -72,10 +94,7 @@ def dashboard(request):
     Tableau de bord pour les utilisateurs validés.
     """
     # Get user's current active service
-    active_service = Service.objects.filter(
-        user=request.user,
-        statut='ouvert'
-    ).first()
+    active_service = request.user.get_active_service()
     
     # Get user's service history (last 5 services)
     service_history = Service.objects.filter(
@@ -104,12 +123,7 @@ def open_service(request):
     Ouvrir un nouveau service pour l'utilisateur.
     """
     # Check if user already has an active service
-    active_service = Service.objects.filter(
-        user=request.user,
-        statut='ouvert'
-    ).first()
-    
-    if active_service:
+    if Service.objects.filter(user=request.user, statut=Service.Statut.OUVERT).exists():
         messages.error(
             request,
             'Vous avez déjà un service actif. '
@@ -118,17 +132,21 @@ def open_service(request):
         return redirect('dashboard')
     
     # Create new service
+    # (the unique constraint rejects a concurrent second open service)
     try:
-        service = Service(user=request.user)
-        service.full_clean()  # Validate before saving
-        service.save()
+        with transaction.atomic():
+            service = Service.objects.create(user=request.user)
         messages.success(
             request,
             f'Service ouvert avec succès ! '
             f'Fermeture automatique le {service.date_fermeture.strftime("%d/%m/%Y à %H:%M")}.'
         )
-    except ValidationError as e:
-        messages.error(request, str(e))
+    except IntegrityError:
+        messages.error(
+            request,
+            'Vous avez déjà un service actif. '
+            'Veuillez fermer votre service actuel avant d\'en ouvrir un nouveau.'
+        )
     
     return redirect('dashboard')
 
@@ -138,10 +156,11 @@ def close_service(request):
     """
     Fermer le service actif de l'utilisateur.
     """
+    # Only the columns written by close_service() are loaded
     active_service = Service.objects.filter(
         user=request.user,
-        statut='ouvert'
-    ).first()
+        statut=Service.Statut.OUVERT
+    ).only('id', 'statut').first()
     
     if not active_service:
         messages.error(request, 'Vous n\'avez pas de service actif à fermer.')
@@ -155,23 +174,16 @@ def close_service(request):
 
 # Validation views
 @login_required
+@require_admin('Seuls les administrateurs peuvent valider des actions.')
 def validate_action(request, action_id):
     """
     Valider une action (admin only).
     """
-    from .models import Action, Validation
-    
-    # Check permission
-    if request.user.role != 'admin':
-        messages.error(request, 'Seuls les administrateurs peuvent valider des actions.')
-        return redirect('dashboard')
-    
-    # Get action
-    try:
-        action = Action.objects.get(id=action_id)
-    except Action.DoesNotExist:
-        messages.error(request, 'Action introuvable.')
-        return redirect('pending_validations')
+    # Get action, with the author, the service and the latest status
+    action = get_object_or_404(
+        Action.objects.select_related('auteur', 'service__user').with_validation_status(),
+        id=action_id
+    )
     
     # Check if already validated
     if action.validation_status == 'validé':
@@ -179,7 +191,7 @@ def validate_action(request, action_id):
         return redirect('pending_validations')
     
     # Warn if self-validation
-    if action.auteur == request.user:
+    if action.auteur_id == request.user.id:
         messages.warning(
             request,
             f'⚠️ Auto-validation détectée : vous validez votre propre action.'
@@ -197,23 +209,16 @@ def validate_action(request, action_id):
 
 
 @login_required
+@require_admin('Seuls les administrateurs peuvent refuser des actions.')
 def reject_action(request, action_id):
     """
     Refuser une action avec commentaire (admin only).
     """
-    from .models import Action, Validation
-    
-    # Check permission
-    if request.user.role != 'admin':
-        messages.error(request, 'Seuls les administrateurs peuvent refuser des actions.')
-        return redirect('dashboard')
-    
-    # Get action
-    try:
-        action = Action.objects.get(id=action_id)
-    except Action.DoesNotExist:
-        messages.error(request, 'Action introuvable.')
-        return redirect('pending_validations')
+    # Get action, with the author, the service and the latest status
+    action = get_object_or_404(
+        Action.objects.select_related('auteur', 'service__user').with_validation_status(),
+        id=action_id
+    )
     
     if request.method == 'POST':
         commentaire = request.POST.get('commentaire', '').strip()
@@ -222,43 +227,32 @@ def reject_action(request, action_id):
             messages.error(request, 'Un commentaire est obligatoire pour refuser une action.')
             return render(request, 'validations/reject.html', {'action': action})
         
-        # Create validation
-        try:
-            validation = Validation(
-                action=action,
-                validateur=request.user,
-                statut='refusé',
-                commentaire=commentaire
-            )
-            validation.full_clean()
-            validation.save()
-            
-            messages.success(request, f'Action #{action.id} refusée avec succès.')
-            return redirect('pending_validations')
-        except ValidationError as e:
-            messages.error(request, str(e))
+        # Create validation: the comment and the admin role are already checked,
+        # and the database constraint guarantees the comment, so a single INSERT
+        Validation.objects.create(
+            action=action,
+            validateur=request.user,
+            statut='refusé',
+            commentaire=commentaire
+        )
+        
+        messages.success(request, f'Action #{action.id} refusée avec succès.')
+        return redirect('pending_validations')
     
     return render(request, 'validations/reject.html', {'action': action})
 
 
 @login_required
+@require_admin('Seuls les administrateurs peuvent commenter des actions.')
 def comment_action(request, action_id):
     """
     Commenter une action sans changer le statut (admin only).
     """
-    from .models import Action, Validation
-    
-    # Check permission
-    if request.user.role != 'admin':
-        messages.error(request, 'Seuls les administrateurs peuvent commenter des actions.')
-        return redirect('dashboard')
-    
-    # Get action
-    try:
-        action = Action.objects.get(id=action_id)
-    except Action.DoesNotExist:
-        messages.error(request, 'Action introuvable.')
-        return redirect('pending_validations')
+    # Get action, with the author, the service and the latest status
+    action = get_object_or_404(
+        Action.objects.select_related('auteur', 'service__user').with_validation_status(),
+        id=action_id
+    )
     
     if request.method == 'POST':
         commentaire = request.POST.get('commentaire', '').strip()
@@ -282,20 +276,17 @@ def comment_action(request, action_id):
 
 
 @login_required
+@require_admin('Seuls les administrateurs peuvent accéder à cette page.')
 def pending_validations(request):
     """
     Liste des actions en attente de validation (admin only).
     """
-    from .models import Action
-    
-    # Check permission
-    if request.user.role != 'admin':
-        messages.error(request, 'Seuls les administrateurs peuvent accéder à cette page.')
-        return redirect('dashboard')
-    
-    # Get all actions pending validation
-    actions = Action.objects.all()
-    pending_actions = [action for action in actions if action.validation_status == 'en_attente']
+    # Get all actions pending validation, filtered on the latest status by the database
+    pending_actions = list(
+        Action.objects.select_related('auteur', 'service__user')
+        .with_validation_status()
+        .filter(_validation_status='en_attente')
+    )
     
     return render(request, 'validations/pending.html', {
         'pending_actions': pending_actions,
@@ -308,16 +299,13 @@ def validation_history(request, action_id):
     """
     Historique des validations pour une action.
     """
-    from .models import Action
-    
-    try:
-        action = Action.objects.get(id=action_id)
-    except Action.DoesNotExist:
-        messages.error(request, 'Action introuvable.')
-        return redirect('dashboard')
+    action = get_object_or_404(
+        Action.objects.select_related('auteur', 'service__user').with_validation_status(),
+        id=action_id
+    )
     
     # Check permission: author or admin
-    if action.auteur != request.user and request.user.role != 'admin':
+    if action.auteur_id != request.user.id and request.user.role != 'admin':
         messages.error(request, 'Vous n\'avez pas accès à cet historique.')
         return redirect('dashboard')
     
@@ -336,11 +324,8 @@ def global_actions_view(request):
     Vue globale des actions avec filtres.
     Accessible à tous les utilisateurs validés.
     """
-    from .models import Action, User, Service
-    from django.core.paginator import Paginator
-    
     # Get all actions
-    actions = Action.objects.select_related('auteur', 'service').all()
+    actions = Action.objects.select_related('auteur', 'service').with_validation_status()
     
     # Apply filters
     date_from = request.GET.get('date_from')
@@ -356,19 +341,19 @@ def global_actions_view(request):
     if user_filter:
         actions = actions.filter(auteur__id=user_filter)
     if status_filter:
-        # Filter by validation status
-        actions = [action for action in actions if action.validation_status == status_filter]
+        # Filter by latest validation status
+        actions = actions.filter(_validation_status=status_filter)
     if service_filter:
         actions = actions.filter(service__id=service_filter)
     
     # Pagination
-    paginator = Paginator(actions if isinstance(actions, list) else actions, 20)
+    paginator = Paginator(actions, 20)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     # Get filter options
-    users = User.objects.filter(is_validated=True).order_by('username')
-    services = Service.objects.all().order_by('-date_ouverture')[:50]
+    users = User.get_validated_users()
+    services = Service.get_recent()
     
     return render(request, 'consultation/actions.html', {
         'page_obj': page_obj,
@@ -389,14 +374,8 @@ def global_services_view(request):
     """
     Vue globale des services avec filtres.
     """
-    from .models import Service, User
-    from django.core.paginator import Paginator
-    from django.db.models import Count
-    
-    # Get all services with action count
-    services = Service.objects.select_related('user').annotate(
-        action_count=Count('actions')
-    ).all()
+    # Get all services
+    services = Service.objects.all()
     
     # Apply filters
     date_from = request.GET.get('date_from')
@@ -410,21 +389,27 @@ def global_services_view(request):
         services = services.filter(date_ouverture__lte=date_to)
     if user_filter:
         services = services.filter(user__id=user_filter)
-    if status_filter:
-        services = services.filter(statut=status_filter)
+    if status_filter in SERVICE_STATUS_FILTERS:
+        services = services.filter(statut=SERVICE_STATUS_FILTERS[status_filter])
+    
+    # Calculate statistics in a single query
+    stats = services.aggregate(
+        total=Count('id'),
+        open=Count('id', filter=Q(statut=Service.Statut.OUVERT)),
+        closed=Count('id', filter=Q(statut=Service.Statut.FERME)),
+    )
     
-    # Pagination
+    # Pagination, with the action count of each service
+    # (the ordering is explicit: Meta.ordering is ignored with GROUP BY)
+    services = services.select_related('user').with_remaining_time().annotate(
+        action_count=Count('actions')
+    ).order_by('-date_ouverture')
     paginator = Paginator(services, 20)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     # Get filter options
-    users = User.objects.filter(is_validated=True).order_by('username')
-    
-    # Calculate statistics
-    total_services = services.count()
-    open_services = services.filter(statut='ouvert').count()
-    closed_services = services.filter(statut='fermé').count()
+    users = User.get_validated_users()
     
     return render(request, 'consultation/services.html', {
         'page_obj': page_obj,
@@ -435,11 +420,7 @@ def global_services_view(request):
             'user': user_filter,
             'status': status_filter,
         },
-        'stats': {
-            'total': total_services,
-            'open': open_services,
-            'closed': closed_services,
-        }
+        'stats': stats
     })
 
 
@@ -448,9 +429,6 @@ def global_validations_view(request):
     """
     Vue globale des validations (admin/validator only).
     """
-    from .models import Validation, User
-    from django.core.paginator import Paginator
-    
     # Check permission
     if request.user.role not in ['admin', 'validator']:
         messages.error(request, 'Accès réservé aux administrateurs et validateurs.')
@@ -486,12 +464,17 @@ def global_validations_view(request):
     
     # Get filter options
     validators = User.objects.filter(role__in=['admin', 'validator']).order_by('username')
-    authors = User.objects.filter(is_validated=True).order_by('username')
+    authors = User.get_validated_users()
     
-    # Calculate statistics
-    total_validations = validations.count()
-    validated_count = validations.filter(statut='validé').count()
-    rejected_count = validations.filter(statut='refusé').count()
+    # Calculate statistics in a single query
+    counts = validations.aggregate(
+        total=Count('id'),
+        validated=Count('id', filter=Q(statut='validé')),
+        rejected=Count('id', filter=Q(statut='refusé')),
+    )
+    total_validations = counts['total']
+    validated_count = counts['validated']
+    rejected_count = counts['rejected']
     
     return render(request, 'consultation/validations.html', {
         'page_obj': page_obj,
@@ -518,10 +501,6 @@ def user_profile_view(request, username=None):
     """
     Vue du profil utilisateur avec historique complet.
     """
-    from .models import User, Service, Action
-    from django.shortcuts import get_object_or_404
-    from datetime import timedelta
-    
     # Determine which user's profile to show
     if username:
         profile_user = get_object_or_404(User, username=username)
@@ -534,10 +513,10 @@ def user_profile_view(request, username=None):
         return redirect('user_profile', username=request.user.username)
     
     # Get service history
-    services = Service.objects.filter(user=profile_user).order_by('-date_ouverture')
+    services = Service.objects.filter(user=profile_user).with_remaining_time().order_by('-date_ouverture')
     
     # Get action history
-    actions = Action.objects.filter(auteur=profile_user).select_related('service').order_by('-date_creation')
+    actions = Action.objects.filter(auteur=profile_user).select_related('service').with_validation_status().order_by('-date_creation')
     
     # Apply action filters
     action_status_filter = request.GET.get('action_status')
@@ -545,29 +524,37 @@ def user_profile_view(request, username=None):
     action_date_to = request.GET.get('action_date_to')
     
     if action_status_filter:
-        actions = [action for action in actions if action.validation_status == action_status_filter]
+        actions = actions.filter(_validation_status=action_status_filter)
     if action_date_from:
-        actions = actions.filter(date_creation__gte=action_date_from) if not isinstance(actions, list) else [a for a in actions if a.date_creation.date() >= action_date_from]
+        actions = actions.filter(date_creation__gte=action_date_from)
     if action_date_to:
-        actions = actions.filter(date_creation__lte=action_date_to) if not isinstance(actions, list) else [a for a in actions if a.date_creation.date() <= action_date_to]
+        actions = actions.filter(date_creation__lte=action_date_to)
     
     # Calculate statistics
-    total_services = services.count()
-    total_service_time = timedelta()
-    for service in services.filter(statut='fermé'):
-        if service.date_fermeture:
-            total_service_time += (service.date_fermeture - service.date_ouverture)
+    # Count the services and sum the closed ones' durations in a single query
+    service_stats = services.aggregate(
+        total=Count('id'),
+        total_time=Sum(
+            F('date_fermeture') - F('date_ouverture'),
+            output_field=DurationField(),
+            filter=Q(statut=Service.Statut.FERME, date_fermeture__isnull=False)
+        ),
+    )
+    total_services = service_stats['total']
+    total_service_time = service_stats['total_time'] or timedelta()
     
-    total_actions = len(actions) if isinstance(actions, list) else actions.count()
-    validated_actions = len([a for a in actions if a.validation_status == 'validé']) if isinstance(actions, list) else sum(1 for a in actions if a.validation_status == 'validé')
-    rejected_actions = len([a for a in actions if a.validation_status == 'refusé']) if isinstance(actions, list) else sum(1 for a in actions if a.validation_status == 'refusé')
+    # Count the actions by status in a single aggregate query
+    action_stats = actions.validation_stats()
+    total_actions = action_stats['total']
+    validated_actions = action_stats['validated']
+    rejected_actions = action_stats['rejected']
     
     validation_rate = (validated_actions / total_actions * 100) if total_actions > 0 else 0
     
     return render(request, 'profile/user_profile.html', {
         'profile_user': profile_user,
         'services': services[:10],  # Last 10 services
-        'actions': actions[:20] if isinstance(actions, list) else actions[:20],  # Last 20 actions
+        'actions': actions[:20],  # Last 20 actions
         'stats': {
             'total_services': total_services,
             'total_service_hours': total_service_time.total_seconds() / 3600,
@@ -575,7 +562,7 @@ def user_profile_view(request, username=None):
             'total_actions': total_actions,
             'validated_actions': validated_actions,
             'rejected_actions': rejected_actions,
-            'pending_actions': total_actions - validated_actions - rejected_actions,
+            'pending_actions': action_stats['pending'],
             'validation_rate': validation_rate,
         },
         'filters': {
@@ -592,9 +579,6 @@ def notifications_list(request):
     """
     Liste des notifications de l'utilisateur.
     """
-    from .models import Notification
-    from django.core.paginator import Paginator
-    
     # Get all notifications for the user
     notifications = Notification.objects.filter(destinataire=request.user)
     
@@ -602,8 +586,8 @@ def notifications_list(request):
     type_filter = request.GET.get('type')
     status_filter = request.GET.get('status')
     
-    if type_filter:
-        notifications = notifications.filter(type=type_filter)
+    if type_filter in NOTIFICATION_TYPE_FILTERS:
+        notifications = notifications.filter(type=NOTIFICATION_TYPE_FILTERS[type_filter])
     if status_filter == 'lue':
         notifications = notifications.filter(lue=True)
     elif status_filter == 'non_lue':
@@ -614,14 +598,16 @@ def notifications_list(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Statistics
-    total_count = Notification.objects.filter(destinataire=request.user).count()
-    unread_count = Notification.objects.filter(destinataire=request.user, lue=False).count()
+    # Statistics, computed in a single query
+    counts = Notification.objects.filter(destinataire=request.user).aggregate(
+        total=Count('id'),
+        unread=Count('id', filter=Q(lue=False)),
+    )
     
     return render(request, 'notifications/list.html', {
         'page_obj': page_obj,
-        'total_count': total_count,
-        'unread_count': unread_count,
+        'total_count': counts['total'],
+        'unread_count': counts['unread'],
         'filters': {
             'type': type_filter,
             'status': status_filter,
@@ -634,17 +620,13 @@ def mark_notification_read(request, notif_id):
     """
     Marquer une notification comme lue.
     """
-    from .models import Notification
-    from django.shortcuts import get_object_or_404
-    
-    notification = get_object_or_404(Notification, id=notif_id, destinataire=request.user)
-    notification.lue = True
-    notification.save()
+    # Une seule requête UPDATE, sans SELECT préalable ni signaux
+    updated = Notification.objects.filter(id=notif_id, destinataire=request.user).update(lue=True)
+    if not updated:
+        raise Http404('Notification introuvable.')
+    broadcast_unread_counts(request.user.id)
     
-    # Redirect to the related object if available
     next_url = request.GET.get('next', 'notifications_list')
-    if notification.action:
-        return redirect('global_actions_view')
     return redirect(next_url)
 
 
@@ -653,9 +635,8 @@ def mark_all_notifications_read(request):
     """
     Marquer toutes les notifications comme lues.
     """
-    from .models import Notification
-    
     updated = Notification.objects.filter(destinataire=request.user, lue=False).update(lue=True)
+    broadcast_unread_counts(request.user.id)
     messages.success(request, f'{updated} notification(s) marquée(s) comme lue(s).')
     
     return redirect('notifications_list')
@@ -666,9 +647,6 @@ def delete_notification(request, notif_id):
     """
     Supprimer une notification.
     """
-    from .models import Notification
-    from django.shortcuts import get_object_or_404
-    
     notification = get_object_or_404(Notification, id=notif_id, destinataire=request.user)
     notification.delete()
     
@@ -677,14 +655,15 @@ def delete_notification(request, notif_id):
 
 
 @login_required
-def get_unread_count(request):
+async def get_unread_count(request):
     """
     API JSON pour obtenir le nombre de notifications non lues.
+    Vue asynchrone : appelée régulièrement par le navigateur.
     """
-    from .models import Notification
-    from django.http import JsonResponse
+    user = await request.auser()
     
-    count = Notification.objects.filter(destinataire=request.user, lue=False).count()
+    # Lu depuis le cache, invalidé à chaque modification des notifications
+    count = await Notification.aget_unread_count(user.id)
     return JsonResponse({'unread_count': count})
 
 
@@ -698,24 +677,16 @@ def action_create(request):
     Vue pour créer une nouvelle action.
     Vérifie qu'un service est actif avant de permettre la création.
     """
-    from .forms import ActionForm
-    from .models import Action, Service
-    from django.utils import timezone
+    # Vérifier si l'utilisateur a un service actif (ouvert et non expiré)
+    active_service = request.user.get_active_service()
     
-    # Vérifier si l'utilisateur a un service actif
-    active_service = Service.objects.filter(
-        user=request.user,
-        statut='ouvert',
-        date_fermeture__gt=timezone.now()
-    ).first()
-    
-    if not active_service:
+    if not (active_service and active_service.is_active()):
         messages.warning(
             request,
             'Vous devez avoir un service actif pour créer une action. '
             'Veuillez d\'abord ouvrir un service.'
         )
-        return redirect('service_open')
+        return redirect('dashboard')
     
     if request.method == 'POST':
         form = ActionForm(request.POST)
@@ -746,48 +717,31 @@ def action_list(request):
     """
     Vue pour afficher la liste des actions de l'utilisateur.
     """
-    from .models import Action, Service, Validation
-    from django.utils import timezone
-    from django.core.paginator import Paginator
-    from django.db.models import Q, Exists, OuterRef
-    
     # Récupérer toutes les actions de l'utilisateur
-    actions = Action.objects.filter(auteur=request.user).order_by('-date_creation')
+    actions = Action.objects.filter(auteur=request.user).select_related(
+        'service'
+    ).with_validation_status().order_by('-date_creation')
     
-    # Vérifier si l'utilisateur a un service actif
-    active_service = Service.objects.filter(
-        user=request.user,
-        statut='ouvert',
-        date_fermeture__gt=timezone.now()
-    ).first()
+    # Vérifier si l'utilisateur a un service actif (ouvert et non expiré)
+    active_service = request.user.get_active_service()
+    if active_service and not active_service.is_active():
+        active_service = None
     
     # Pagination
     paginator = Paginator(actions, 20)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Statistiques - calculées manuellement car validation_status est une propriété
-    total_actions = actions.count()
-    validated_actions = 0
-    pending_actions = 0
-    rejected_actions = 0
-    
-    for action in actions:
-        status = action.validation_status
-        if status == 'validé':
-            validated_actions += 1
-        elif status == 'refusé':
-            rejected_actions += 1
-        else:
-            pending_actions += 1
+    # Statistiques - une seule requête agrégée, mise en cache
+    stats = Action.get_validation_stats(request.user.id)
     
     context = {
         'page_obj': page_obj,
         'active_service': active_service,
-        'total_actions': total_actions,
-        'validated_actions': validated_actions,
-        'pending_actions': pending_actions,
-        'rejected_actions': rejected_actions,
+        'total_actions': stats['total'],
+        'validated_actions': stats['validated'],
+        'pending_actions': stats['pending'],
+        'rejected_actions': stats['rejected'],
     }
     return render(request, 'actions/list.html', context)
 
@@ -801,11 +755,6 @@ def action_edit(request, action_id):
     - Le service est encore actif
     - L'action n'est pas validée
     """
-    from .forms import ActionForm
-    from .models import Action, Service
-    from django.utils import timezone
-    from django.shortcuts import get_object_or_404
-    
     action = get_object_or_404(Action, id=action_id)
     
     # Vérifier que l'utilisateur est l'auteur
@@ -814,7 +763,7 @@ def action_edit(request, action_id):
         return redirect('action_list')
     
     # Vérifier que le service est encore actif
-    if action.service.statut != 'ouvert' or action.service.date_fermeture <= timezone.now():
+    if action.service.statut != Service.Statut.OUVERT or action.service.date_fermeture <= timezone.now():
         messages.error(
             request,
             'Vous ne pouvez plus modifier cette action car le service est fermé.'
@@ -850,30 +799,64 @@ def action_edit(request, action_id):
 # USER MENTION API
 # ============================================================================
 
+USER_SEARCH_CACHE_KEY = 'users:search:{}'
+USER_SEARCH_CACHE_TIMEOUT = 60
+ROLE_DISPLAY = dict(User.ROLE_CHOICES)
+
+
+def _user_search_result(user_id, username, role):
+    """
+    Format a user for the @mention autocomplete.
+    """
+    return {
+        'id': user_id,
+        'username': username,
+        'role': role,
+        'role_display': ROLE_DISPLAY.get(role, role)
+    }
+
+
+def _search_users(query):
+    """
+    Find the validated users matching a username prefix (cached), then
+    release the database connection held by the worker thread.
+    """
+    try:
+        if not query:
+            # All validated users if no query (cached list)
+            return [
+                _user_search_result(user.id, user.username, user.role)
+                for user in User.get_validated_users()[:10]
+            ]
+        
+        # Results are cached briefly per prefix, typed again and again while
+        # mentioning someone (role changes show up after the timeout)
+        cache_key = USER_SEARCH_CACHE_KEY.format(hashlib.md5(query.lower().encode()).hexdigest())
+        user_list = cache.get(cache_key)
+        if user_list is None:
+            # Search by username (case-insensitive), only the returned columns
+            users = User.objects.filter(
+                username__istartswith=query,
+                is_validated=True
+            ).order_by('username').values_list('id', 'username', 'role')[:10]
+            user_list = [_user_search_result(*user) for user in users]
+            cache.set(cache_key, user_list, USER_SEARCH_CACHE_TIMEOUT)
+        return user_list
+    finally:
+        connection.close()
+
+
 @login_required
-def user_search_api(request):
+async def user_search_api(request):
     """
     API endpoint to search users for @mention autocomplete.
     Returns JSON list of users matching the query.
+    Asynchronous view: called on each keystroke.
     """
     query = request.GET.get('q', '').strip()
     
-    if not query:
-        # Return all validated users if no query
-        users = User.objects.filter(is_validated=True).order_by('username')[:10]
-    else:
-        # Search by username (case-insensitive)
-        users = User.objects.filter(
-            username__istartswith=query,
-            is_validated=True
-        ).order_by('username')[:10]
-    
-    # Format response
-    user_list = [{
-        'id': user.id,
-        'username': user.username,
-        'role': user.role,
-        'role_display': user.get_role_display()
-    } for user in users]
+    # The whole lookup, cache reads included, runs outside the single shared
+    # sync thread so keystrokes from several users don't queue behind each other
+    user_list = await sync_to_async(_search_users, thread_sensitive=False)(query)
     
     return JsonResponse({'users': user_list})